@@ -0,0 +1,249 @@
+from market_time import MARKET_TZ
+from datetime import datetime
+import numpy as np
+import csv
+import os
+import time
+
+
+# Bar intervals in seconds
+INTERVALS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "1d": 86400}
+BAR_COLUMNS = ["date", "Open", "High", "Low", "Close"]
+
+
+class BarBuffer:
+    """
+    Fixed-size ring buffer of completed OHLC bars for one interval, plus the bar
+    that is currently being built. The array is allocated once, so memory use does
+    not grow with uptime.
+    """
+
+    # Column layout of the buffer
+    TIME, OPEN, HIGH, LOW, CLOSE, TICKS = range(6)
+
+    def __init__(self, interval_secs, capacity):
+        """
+        Initialize the BarBuffer.
+
+        Args:
+            interval_secs (int): Length of one bar in seconds.
+            capacity (int): Number of completed bars kept in memory.
+        """
+        self.interval_secs = interval_secs
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, 6), dtype=np.float64)
+        self.current = np.zeros(6, dtype=np.float64)
+        self.has_current = False
+        self.head = 0
+        self.count = 0
+
+
+    def bucket_start(self, ts, utc_offset):
+        """
+        Start of the bar containing `ts`, aligned to bar boundaries in market time.
+        """
+        local = ts + utc_offset
+        return local - local % self.interval_secs - utc_offset
+
+
+    def update(self, price, ts, utc_offset):
+        """
+        Add a quote to the current bar.
+
+        Returns:
+            np.ndarray or None: The bar completed by this quote, if any.
+        """
+        start = self.bucket_start(ts, utc_offset)
+        completed = None
+        if self.has_current and start != self.current[self.TIME]:
+            completed = self._close_current()
+
+        if not self.has_current:
+            self.current[:] = (start, price, price, price, price, 0)
+            self.has_current = True
+        else:
+            cur = self.current
+            cur[self.HIGH] = max(cur[self.HIGH], price)
+            cur[self.LOW] = min(cur[self.LOW], price)
+            cur[self.CLOSE] = price
+        self.current[self.TICKS] += 1
+        return completed
+
+
+    def flush(self, ts):
+        """
+        Close the current bar if its interval has ended by `ts`.
+
+        Returns:
+            np.ndarray or None: The completed bar, if any.
+        """
+        if self.has_current and ts >= self.current[self.TIME] + self.interval_secs:
+            return self._close_current()
+        return None
+
+
+    def bars(self):
+        """
+        Completed bars in memory, oldest first.
+
+        Returns:
+            np.ndarray: Copy of shape (n, 6) with columns time, open, high, low, close, ticks.
+        """
+        if self.count < self.capacity:
+            return self.buffer[:self.count].copy()
+        return np.roll(self.buffer, -self.head, axis=0)
+
+
+    def _close_current(self):
+        self.buffer[self.head] = self.current
+        bar = self.buffer[self.head]
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.has_current = False
+        return bar.copy()
+
+
+
+class BarResampler:
+    """
+    Aggregates live quotes into OHLC bars for several intervals at once.
+
+    Completed bars are passed to every registered sink as `sink(interval, bar)`,
+    where `bar` is a dict with the same columns as the raw daily CSV.
+    """
+
+    def __init__(self, intervals=("1m", "5m", "15m", "1h", "1d"), capacity=1440, sinks=None, tz=MARKET_TZ):
+        """
+        Initialize the BarResampler.
+
+        Args:
+            intervals (iterable): Interval names from INTERVALS.
+            capacity (int): Number of completed bars kept in memory per interval.
+            sinks (list): Callables receiving each completed bar.
+            tz (ZoneInfo): Time zone the bar boundaries are aligned to.
+        """
+        unknown = [i for i in intervals if i not in INTERVALS]
+        if unknown:
+            raise ValueError(f"Unsupported bar intervals: {unknown}. Use any of {list(INTERVALS)}")
+        self.buffers = {i: BarBuffer(INTERVALS[i], capacity) for i in intervals}
+        self.sinks = list(sinks or [])
+        self.tz = tz
+
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+
+    def update(self, price, ts=None):
+        """
+        Feed one quote into every interval.
+
+        Args:
+            price (float): Quoted price.
+            ts (float, optional): Unix timestamp of the quote, now if None.
+
+        Returns:
+            list: (interval, bar) pairs completed by this quote.
+        """
+        ts = time.time() if ts is None else ts
+        offset = self._utc_offset(ts)
+        completed = []
+        for interval, buf in self.buffers.items():
+            bar = buf.update(price, ts, offset)
+            if bar is not None:
+                completed.append((interval, bar))
+        return self._emit(completed)
+
+
+    def flush(self, ts=None):
+        """
+        Close every bar whose interval has ended, e.g. at the market close when no
+        further quote will arrive to close it.
+
+        Returns:
+            list: (interval, bar) pairs completed by the flush.
+        """
+        ts = time.time() if ts is None else ts
+        completed = []
+        for interval, buf in self.buffers.items():
+            bar = buf.flush(ts)
+            if bar is not None:
+                completed.append((interval, bar))
+        return self._emit(completed)
+
+
+    def bars(self, interval):
+        """
+        Completed bars of one interval still held in memory, oldest first.
+        """
+        return self.buffers[interval].bars()
+
+
+    def current_bar(self, interval):
+        """
+        The bar of one interval that is still being built.
+
+        Returns:
+            dict or None: Bar with the same keys as completed bars, None before the first quote.
+        """
+        buf = self.buffers[interval]
+        return self._to_dict(buf.current) if buf.has_current else None
+
+
+    def _emit(self, completed):
+        bars = [(interval, self._to_dict(bar)) for interval, bar in completed]
+        for interval, bar in bars:
+            for sink in self.sinks:
+                try:
+                    sink(interval, bar)
+                except Exception as e:
+                    print(f"Bar sink failed for {interval} bar: {e}")
+        return bars
+
+
+    def _to_dict(self, bar):
+        return {
+            "date": datetime.fromtimestamp(bar[BarBuffer.TIME], self.tz),
+            "Open": float(bar[BarBuffer.OPEN]),
+            "High": float(bar[BarBuffer.HIGH]),
+            "Low": float(bar[BarBuffer.LOW]),
+            "Close": float(bar[BarBuffer.CLOSE]),
+        }
+
+
+    def _utc_offset(self, ts):
+        return datetime.fromtimestamp(ts, self.tz).utcoffset().total_seconds()
+
+
+
+class CsvBarStore:
+    """
+    Bar sink that appends completed bars to one CSV per interval, in the same
+    layout as the raw daily data so `periodic_retrain.load_data` can read them.
+    """
+
+    def __init__(self, directory="../data/raw/intraday", prefix="eur_usd"):
+        """
+        Initialize the CsvBarStore.
+
+        Args:
+            directory (str): Directory the CSV files are written to.
+            prefix (str): File name prefix, files are named <prefix>_<interval>.csv.
+        """
+        self.directory = directory
+        self.prefix = prefix
+
+
+    def path(self, interval):
+        return os.path.join(self.directory, f"{self.prefix}_{interval}.csv")
+
+
+    def __call__(self, interval, bar):
+        path = self.path(interval)
+        os.makedirs(self.directory, exist_ok=True)
+        new_file = not os.path.exists(path)
+        with open(path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(BAR_COLUMNS)
+            writer.writerow([bar["date"].strftime("%Y-%m-%d %H:%M:%S")] + [bar[c] for c in BAR_COLUMNS[1:]])
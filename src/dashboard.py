@@ -0,0 +1,343 @@
+from market_time import MARKET_TZ, MARKET_CLOSE_HOUR
+from datetime import datetime
+import numpy as np
+import threading
+import time
+import os
+
+
+class TickSeries:
+    """
+    Price history of the current session at a fixed time resolution.
+
+    Ticks falling in the same slot are merged into that slot's min and max, so
+    a full day of sub-second ticks fits in two preallocated arrays.
+    """
+
+    def __init__(self, resolution=1.0, session_secs=MARKET_CLOSE_HOUR * 3600):
+        """
+        Initialize the TickSeries.
+
+        Args:
+            resolution (float): Seconds covered by one slot.
+            session_secs (int): Length of the session from midnight, market time.
+        """
+        self.resolution = resolution
+        self.size = int(session_secs / resolution)
+        self.low = np.full(self.size, np.nan)
+        self.high = np.full(self.size, np.nan)
+        self.session_date = None
+        self.day_high = None
+        self.day_low = None
+        self.version = 0
+
+
+    def add(self, price, ts):
+        """
+        Add a tick at Unix timestamp `ts`. Starts a new series on a new session date.
+        """
+        now = datetime.fromtimestamp(ts, MARKET_TZ)
+        if now.date() != self.session_date:
+            self.session_date = now.date()
+            self.low.fill(np.nan)
+            self.high.fill(np.nan)
+            self.day_high = self.day_low = None
+
+        secs = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+        i = min(int(secs / self.resolution), self.size - 1)
+        self.low[i] = np.fmin(self.low[i], price)
+        self.high[i] = np.fmax(self.high[i], price)
+
+        if self.day_high is None or price > self.day_high[0]:
+            self.day_high = (price, now)
+        if self.day_low is None or price < self.day_low[0]:
+            self.day_low = (price, now)
+        self.version += 1
+
+
+    def decimate(self, width):
+        """
+        Reduce the session to one min/max pair per pixel column.
+
+        Args:
+            width (int): Number of pixel columns.
+
+        Returns:
+            tuple: (lows, highs) arrays of length `width`, NaN where a column has no ticks.
+        """
+        edges = np.linspace(0, self.size, width + 1).astype(int)[:-1]
+        return np.fmin.reduceat(self.low, edges), np.fmax.reduceat(self.high, edges)
+
+
+
+class Dashboard:
+    """
+    Real-time pygame view of the live loop: price chart with the session high and
+    low highlighted, the close prediction and countdown timers.
+
+    The live loop only pushes data into the dashboard, so a slow frame never delays
+    polling or inference. The window must be driven from the main thread with
+    `run()`, since SDL on macOS only handles windows and events there; the live
+    loop then runs on a worker thread. Headless mode has no window and renders on
+    its own thread via `start()`. In headless mode
+    a frame is drawn off-screen after each push and saved to a fixed ring of
+    image files, so disk use stays bounded.
+    """
+
+    BACKGROUND = (18, 18, 24)
+    GRID = (50, 50, 60)
+    PRICE = (90, 170, 255)
+    HIGH = (80, 220, 120)
+    LOW = (240, 90, 90)
+    PREDICTION = (250, 200, 60)
+    TEXT = (220, 220, 220)
+
+    def __init__(self, width=1280, height=720, fps=60, headless=False,
+                 frame_dir="../data/frames", keep_frames=10, max_frames=None, resolution=1.0):
+        """
+        Initialize the Dashboard.
+
+        Args:
+            width (int): Window width in pixels.
+            height (int): Window height in pixels.
+            fps (int): Target frame rate.
+            headless (bool): Render off-screen and save frames to `frame_dir`.
+            frame_dir (str): Directory headless frames are written to.
+            keep_frames (int): Number of frame files kept in headless mode, older ones are overwritten.
+            max_frames (int, optional): Stop after rendering this many frames in headless mode.
+            resolution (float): Seconds per slot of the stored tick history.
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.headless = headless
+        self.frame_dir = frame_dir
+        self.keep_frames = keep_frames
+        self.max_frames = max_frames
+
+        self.series = TickSeries(resolution)
+        self.state = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._dirty = threading.Event()
+        self._thread = None
+        self._cache = (None, None, None)
+        self._font = None
+
+
+    def push_quote(self, price, ts=None):
+        """
+        Add a live price reading to the chart.
+        """
+        with self._lock:
+            self.series.add(price, time.time() if ts is None else ts)
+        self._dirty.set()
+
+
+    def push_update(self, data, prediction, confidence, next_poll_secs):
+        """
+        Update the panel with the result of one live loop cycle.
+
+        Args:
+            data (dict): Quote returned by `update_data`.
+            prediction (float): Predicted closing price.
+            confidence (float): Prediction confidence in percent.
+            next_poll_secs (float): Seconds until the next reading.
+        """
+        with self._lock:
+            self.state = {
+                "price": data["price"],
+                "open_price": data["open_price"],
+                "stale": data.get("stale", False),
+                "prediction": prediction,
+                "confidence": confidence,
+                "next_poll_at": time.time() + next_poll_secs,
+            }
+        self._dirty.set()
+
+
+    def run(self):
+        """
+        Run the render loop on the calling thread until `stop()` is called or the
+        window is closed. Must be the main thread when a window is shown.
+        """
+        self._run()
+
+
+    def start(self):
+        """
+        Start the headless render loop on a daemon thread.
+        """
+        if not self.headless:
+            raise ValueError("The dashboard window must run on the main thread, use run() instead.")
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dashboard", daemon=True)
+        self._thread.start()
+
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._dirty.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+
+    def frame_path(self, n):
+        """
+        File the n-th headless frame is written to.
+        """
+        return os.path.join(self.frame_dir, f"frame_{n % self.keep_frames:02d}.png")
+
+
+    def render_to_file(self, path):
+        """
+        Render a single frame off-screen and save it, without starting the render loop.
+        """
+        import pygame
+        pygame.font.init()
+        surface = pygame.Surface((self.width, self.height))
+        self.render(surface)
+        pygame.image.save(surface, path)
+
+
+    def _run(self):
+        if self.headless:
+            self._run_headless()
+        else:
+            self._run_window()
+
+
+    def _run_headless(self):
+        import pygame
+
+        pygame.font.init()
+        surface = pygame.Surface((self.width, self.height))
+        os.makedirs(self.frame_dir, exist_ok=True)
+        rendered = 0
+        try:
+            while not self._stop.is_set():
+                # A frame only changes when the live loop pushes data, so wait for a push
+                if not self._dirty.wait(timeout=1):
+                    continue
+                self._dirty.clear()
+                if self._stop.is_set():
+                    break
+
+                self.render(surface)
+                path = self.frame_path(rendered)
+                tmp_path = path[:-len(".png")] + ".tmp.png"
+                pygame.image.save(surface, tmp_path)
+                os.replace(tmp_path, path)
+                rendered += 1
+                if self.max_frames and rendered >= self.max_frames:
+                    break
+        finally:
+            pygame.font.quit()
+
+
+    def _run_window(self):
+        import pygame
+
+        pygame.display.init()
+        pygame.font.init()
+        surface = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption("MoneyBot")
+
+        clock = pygame.time.Clock()
+        try:
+            while not self._stop.is_set():
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self._stop.set()
+
+                self.render(surface)
+                pygame.display.flip()
+                clock.tick(self.fps)
+        finally:
+            pygame.quit()
+
+
+    def render(self, surface):
+        """
+        Draw one frame onto a pygame surface.
+        """
+        import pygame
+
+        pad, panel_w = 20, 320
+        plot = pygame.Rect(pad, pad, surface.get_width() - panel_w - 2 * pad, surface.get_height() - 2 * pad)
+
+        # Snapshot under the lock, draw outside it so pushes never wait on a frame
+        with self._lock:
+            state = dict(self.state)
+            day_high, day_low = self.series.day_high, self.series.day_low
+            lows, highs = self._decimated(plot.width)
+
+        surface.fill(self.BACKGROUND)
+        pygame.draw.rect(surface, self.GRID, plot, 1)
+        if self._font is None:
+            self._font = pygame.font.Font(None, 26)
+        font = self._font
+
+        has_ticks = not np.all(np.isnan(lows))
+        if has_ticks:
+            y_min, y_max = np.nanmin(lows), np.nanmax(highs)
+            if state.get("prediction") is not None:
+                y_min = min(y_min, state["prediction"])
+                y_max = max(y_max, state["prediction"])
+            span = (y_max - y_min) or 1e-5
+            y_min, y_max = y_min - 0.05 * span, y_max + 0.05 * span
+
+            def to_y(price):
+                return plot.bottom - (price - y_min) / (y_max - y_min) * plot.height
+
+            # One vertical segment per column covering that column's min and max
+            for x in np.flatnonzero(~np.isnan(lows)):
+                pygame.draw.line(surface, self.PRICE, (plot.left + x, to_y(lows[x])), (plot.left + x, to_y(highs[x])))
+
+            for extreme, colour in ((day_high, self.HIGH), (day_low, self.LOW)):
+                y = to_y(extreme[0])
+                pygame.draw.line(surface, colour, (plot.left, y), (plot.right, y), 1)
+                surface.blit(font.render(f"{extreme[0]:.5f} @ {extreme[1]:%H:%M:%S}", True, colour), (plot.left + 5, y - 20))
+
+            if state.get("prediction") is not None:
+                y = to_y(state["prediction"])
+                for x in range(plot.left, plot.right, 12):
+                    pygame.draw.line(surface, self.PREDICTION, (x, y), (min(x + 6, plot.right), y), 2)
+        else:
+            surface.blit(font.render("Waiting for readings...", True, self.TEXT), (plot.left + 10, plot.top + 10))
+
+        now = time.time()
+        close = datetime.now(MARKET_TZ).replace(hour=MARKET_CLOSE_HOUR, minute=0, second=0, microsecond=0)
+        to_close = max(0, int(close.timestamp() - now))
+        to_poll = max(0, int(state.get("next_poll_at", now) - now))
+
+        lines = [
+            (f"Price:       {state['price']:.5f}" if "price" in state else "Price:       -", self.TEXT),
+            (f"Open:        {state.get('open_price', '-')}", self.TEXT),
+            (f"High:        {day_high[0]:.5f} @ {day_high[1]:%H:%M:%S}" if day_high else "High:        -", self.HIGH),
+            (f"Low:         {day_low[0]:.5f} @ {day_low[1]:%H:%M:%S}" if day_low else "Low:         -", self.LOW),
+            (f"Prediction:  {state['prediction']:.5f}" if "prediction" in state else "Prediction:  -", self.PREDICTION),
+            (f"Confidence:  {state.get('confidence', '-')}%", self.TEXT),
+            (f"To close:    {to_close // 3600:02}:{to_close % 3600 // 60:02}:{to_close % 60:02}", self.TEXT),
+            (f"Next read:   {to_poll}s", self.TEXT),
+        ]
+        if state.get("stale"):
+            lines.append(("STALE QUOTE", self.LOW))
+
+        x = surface.get_width() - panel_w
+        for i, (text, colour) in enumerate(lines):
+            surface.blit(font.render(text, True, colour), (x, pad + i * 32))
+
+
+    def _decimated(self, width):
+        """
+        Decimated columns for `width`, recomputed only when new ticks arrived.
+        Must be called with the lock held.
+        """
+        version, cached_width, columns = self._cache
+        if version != self.series.version or cached_width != width:
+            columns = self.series.decimate(width)
+            self._cache = (self.series.version, width, columns)
+        return columns
@@ -2,7 +2,9 @@ from dotenv import load_dotenv
 import os
 import sys
 import pandas as pd
+from datetime import datetime
 from alpha_vantage.foreignexchange import ForeignExchange
+from market_time import MARKET_TZ
 
 
 def get_hist_data(file_name, symbol):
@@ -63,7 +65,8 @@ def fetch_alpha_vantage_data(api_key, symbol, from_date=None):
 
     Returns:
         pandas.DataFrame: A DataFrame containing the historical exchange rate data,
-                          with columns for Open, High, Low, and Close prices, starting from `from_date` (if provided).
+                          with columns for Open, High, Low, and Close prices, starting from `from_date` (if provided)
+                          and ending with the last session before today.
     """
     if symbol.upper() == 'EURUSD':
         from_symbol = 'EUR'
@@ -94,6 +97,11 @@ def fetch_alpha_vantage_data(api_key, symbol, from_date=None):
         if not data.empty:
             data = data.iloc[1:]  # Remove the first entry (duplicate)
 
+    # Today's bar is still forming and would never be corrected once appended,
+    # so only keep sessions dated before today in market time
+    today = pd.Timestamp(datetime.now(MARKET_TZ).date())
+    data = data[pd.to_datetime(data.index) < today]
+
     return data
 
 
@@ -1,17 +1,30 @@
 from yahoo_scrape import YahooFinScrape
 from trade_bot import TradeBot
 from periodic_retrain import retrain
+from retrain_worker import RetrainWorker
+from poll_scheduler import PollScheduler
+from market_time import MARKET_TZ, MARKET_CLOSE_HOUR
+from bar_resampler import BarResampler, CsvBarStore
+from model_store import MODEL_PATH, SCALER_PATH, INTRADAY_MODEL_DIR, read_manifest
+import threading
 import time
 import sys
 from datetime import datetime
-from zoneinfo import ZoneInfo
+
+
+# Bar interval of the intraday model, trained on the bars written by CsvBarStore
+INTRADAY_INTERVAL = "1h"
+# Two 23-hour sessions of 1h bars
+INTRADAY_HOLDOUT_BARS = 46
 
 
 def main():
-    if len(sys.argv) != 2:
+    if len(sys.argv) not in (2, 3):
         print("""Insufficient command line arguments!
         Please run:
             python/python3 main.py <ticker> for live prediction,
+            python/python3 main.py <ticker> gui for live prediction with the dashboard,
+            python/python3 main.py <ticker> headless to save dashboard frames to ../data/frames,
             python/python3 main.py <retrain> for automatic model retraining
             """)
     if sys.argv[1].lower() == "retrain":
@@ -21,44 +34,139 @@ def main():
         ticker = set_ticker(sys.argv[1])
         scraper = YahooFinScrape()
         model = TradeBot()
-        run_live(scraper, model, ticker)
+        scheduler = PollScheduler(log_path="../data/logs/poll_decisions.csv")
+        store = CsvBarStore()
+        resampler = BarResampler(sinks=[store])
+        dashboard = set_dashboard(sys.argv[2] if len(sys.argv) == 3 else None)
+        workers = [
+            RetrainWorker(model_path=MODEL_PATH, scaler_path=SCALER_PATH),
+            # Own model directory and no legacy model, so it never competes with or prunes the daily model
+            RetrainWorker(holdout_bars=INTRADAY_HOLDOUT_BARS, fetch_data=False,
+                          data_path=store.path(INTRADAY_INTERVAL), model_dir=INTRADAY_MODEL_DIR),
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            if dashboard and not dashboard.headless:
+                # SDL needs the window on the main thread, so the live loop moves to a worker thread
+                live = threading.Thread(target=run_live_until_closed, name="live",
+                                        args=(scraper, model, ticker, scheduler, resampler, dashboard),
+                                        daemon=True)
+                live.start()
+                dashboard.run()
+            else:
+                if dashboard:
+                    dashboard.start()
+                run_live(scraper, model, ticker, scheduler, resampler, dashboard)
+        finally:
+            for worker in workers:
+                worker.stop(timeout=5)
+            if dashboard:
+                dashboard.stop(timeout=5)
 
 
-def run_live(scraper, model, ticker):
+def run_live(scraper, model, ticker, scheduler, resampler, dashboard=None):
+    intraday_model = None
     while True:
+        if not scheduler.is_open():
+            # No quote will close the last bars of the session, close them here
+            resampler.flush()
+            decision = scheduler.next_poll()
+            log_decision(decision)
+            time.sleep(decision["delay"])
+            continue
+
+        model.reload_if_updated()
+        intraday_model = load_intraday_model(intraday_model)
         data = update_data(scraper, ticker)
-        close_timer = get_countdown()
-        prediction = model.predict(data)
-        pred_accuracy = model.pred_confidence(close_timer)
-        log_update(data, close_timer, prediction, pred_accuracy)
-        time.sleep(180)
+        fresh = data is not None and not data["stale"]
+        # Charge the HTTP attempts actually made, retries included and breaker refusals excluded
+        scheduler.record_request(data["price"] if fresh else None, attempts=scraper.policy.last_attempts)
+        if fresh:
+            resampler.update(data["price"])
+            if dashboard:
+                dashboard.push_quote(data["price"])
+        decision = scheduler.next_poll()
+        if data:
+            close_timer = get_countdown()
+            prediction = model.predict(data)
+            pred_accuracy = model.pred_confidence(close_timer)
+            intraday_prediction = predict_intraday(intraday_model, resampler)
+            log_update(data, close_timer, prediction, pred_accuracy, intraday_prediction)
+            if dashboard:
+                dashboard.push_update(data, prediction, pred_accuracy, decision["delay"])
+        log_decision(decision)
+        time.sleep(decision["delay"])
         
         
-def update_data(scraper, ticker, max_retries=3, retry_delay=5):
+def run_live_until_closed(scraper, model, ticker, scheduler, resampler, dashboard):
+    """
+    Runs the live loop on a worker thread and closes the dashboard window if the
+    loop stops, so a crash is not hidden behind a frozen chart.
+    """
+    try:
+        run_live(scraper, model, ticker, scheduler, resampler, dashboard)
+    finally:
+        dashboard.stop()
+
+
+def load_intraday_model(model):
+    """
+    Returns the intraday model, or None until the intraday retrain worker has
+    promoted a first one. A loaded model is reloaded when a newer one is promoted.
     """
-    Fetches data for the ticker and retries on failure.
+    if model is not None:
+        model.reload_if_updated()
+        return model
+    if read_manifest(INTRADAY_MODEL_DIR) is None:
+        return None
+    try:
+        return TradeBot(INTRADAY_MODEL_DIR, model_path=None, scaler_path=None)
+    except ValueError as e:
+        print(f"Could not load intraday model: {e}")
+        return None
+
+
+def predict_intraday(model, resampler):
+    """
+    Predicts the close of the current intraday bar from its open, high and low so far.
+
+    Returns:
+        float or None: Predicted close, None without a model or a bar in progress
+    """
+    bar = resampler.current_bar(INTRADAY_INTERVAL)
+    if model is None or bar is None:
+        return None
+    try:
+        return model.predict({
+            "price": bar["Close"],
+            "open_price": bar["Open"],
+            "day_high": bar["High"],
+            "day_low": bar["Low"],
+        })
+    except ValueError as e:
+        print(f"Intraday prediction failed: {e}")
+        return None
+
+
+def update_data(scraper, ticker):
+    """
+    Fetches data for the ticker. Retries, the per-cycle deadline and the circuit
+    breaker are handled by the scraper's retry policy.
 
     Args:
         scraper: Your YahooFinanceScraper instance
         ticker (str): Ticker symbol
-        max_retries (int): How many times to retry on failure
-        retry_delay (int): Seconds to wait between retries
 
     Returns:
-        dict or None: Ticker data if successful, or None on repeated failures
+        dict or None: Ticker data, flagged as stale if it is the last known quote,
+                      or None if no quote is available at all
     """
-    for attempt in range(1, max_retries + 1):
-        try:
-            data = scraper.get_ticker_data(ticker)
-            return data
-                
-        except Exception as e:
-            print(f"Attempt {attempt} failed: {e}")
-            if attempt == max_retries:
-                print("All retries failed, returning None.")
-                return None
-            time.sleep(retry_delay)
-    
+    data = scraper.get_quote(ticker)
+    if data is None:
+        print("Fetch failed and no previous quote is available.")
+    return data
+
 
 def get_countdown():
     """
@@ -66,11 +174,10 @@ def get_countdown():
     using local time in Africa/Johannesburg.
     """
     try:
-        tz = ZoneInfo("Africa/Johannesburg")
-        current_time = datetime.now(tz)
+        current_time = datetime.now(MARKET_TZ)
         # Define market close time (23:00) in the same time zone
         market_close_today = current_time.replace(
-            hour=23, minute=0, second=0, microsecond=0
+            hour=MARKET_CLOSE_HOUR, minute=0, second=0, microsecond=0
         )
 
         # If current time is already past 23:00, return 0
@@ -90,7 +197,7 @@ def get_countdown():
         return None
 
 
-def log_update(data, close_timer, prediction, pred_accuracy):
+def log_update(data, close_timer, prediction, pred_accuracy, intraday_prediction=None):
     price = data["price"]
     open = data["open_price"]
     day_high = data["day_high"]
@@ -105,10 +212,40 @@ def log_update(data, close_timer, prediction, pred_accuracy):
     print(f"Predicted Closing Price:    {round(prediction, 5)}")
     print(f"Predicted price is:         {round(unit_diff, 5)} units {diff_direction} than current price.")
     print(f"Prediction Confidence:      {pred_accuracy}%")
+    if intraday_prediction is not None:
+        print(f"Predicted {INTRADAY_INTERVAL} Bar Close:     {round(intraday_prediction, 5)}")
     print(f"Time to Market Close:       {close_timer}")
+    if data.get("stale"):
+        print(f"WARNING: live fetch failed, showing last known quote from {int(data['age'])}s ago.")
     print("_____________________________________________________________________")
     
 
+def log_decision(decision):
+    """
+    Print why the scheduler chose the next polling delay.
+    """
+    print(f"Next poll in {int(decision['delay'])}s ({decision['reason']}) | "
+          f"market open: {decision['market_open']}, "
+          f"to close: {int(decision['time_to_close'])}s, "
+          f"volatility: {decision['volatility']:.6f}, "
+          f"requests left: {decision['requests_left']}")
+
+
+def set_dashboard(arg):
+    """
+    Create the dashboard requested on the command line, if any.
+    The import is deferred so pygame is only needed when the dashboard is used.
+    """
+    if arg is None:
+        return None
+    if arg.lower() not in ("gui", "headless"):
+        print("Unknown display mode. Try gui or headless")
+        return None
+
+    from dashboard import Dashboard
+    return Dashboard(headless=arg.lower() == "headless")
+
+
 def set_ticker(arg):
     if arg.upper() == "EURUSD" or arg.upper() == "EURUSD=X":
         return "EURUSD=X"
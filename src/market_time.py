@@ -0,0 +1,7 @@
+from zoneinfo import ZoneInfo
+
+
+# Time zone of the daily candle the models predict
+MARKET_TZ = ZoneInfo("Africa/Johannesburg")
+# Hour (market time) at which the daily candle closes
+MARKET_CLOSE_HOUR = 23
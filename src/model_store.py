@@ -0,0 +1,118 @@
+from market_time import MARKET_TZ
+from datetime import datetime
+import json
+import os
+import shutil
+
+
+MODEL_PATH = "../models/EURUSD_daily/rf_model_full_138.joblib"
+SCALER_PATH = "../models/EURUSD_daily/eurusd_scaler"
+MODEL_DIR = "../models/EURUSD_daily"
+INTRADAY_MODEL_DIR = "../models/EURUSD_1h"
+
+# Every model directory holds exactly one manifest, so two models can never share
+# (and prune) each other's versions
+MANIFEST_NAME = "manifest.json"
+MODEL_FILE = "model.joblib"
+SCALER_FILE = "scaler"
+
+
+def manifest_path(model_dir=MODEL_DIR):
+    """
+    Path of the manifest of the model kept in `model_dir`.
+    """
+    return os.path.join(model_dir, MANIFEST_NAME)
+
+
+def read_manifest(model_dir=MODEL_DIR, model_path=None, scaler_path=None):
+    """
+    Reads which model and scaler are live, and the date of the last bar they were trained on.
+
+    Without a manifest the legacy `model_path` and `scaler_path` are used, and the
+    model file's modification date is taken as its training cutoff, since it was
+    trained on all data available when it was saved.
+
+    Args:
+        model_dir (str): Directory of the model, holding its manifest and versions.
+        model_path (str, optional): Legacy model used when there is no manifest yet.
+        scaler_path (str, optional): Legacy scaler used when there is no manifest yet.
+
+    Returns:
+        dict or None: "model" and "scaler" paths and "cutoff" (str or None),
+                      or None if there is no live model at all.
+    """
+    try:
+        with open(manifest_path(model_dir)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        if model_path is None or not os.path.exists(model_path):
+            return None
+        mtime = os.path.getmtime(model_path)
+        cutoff = datetime.fromtimestamp(mtime, MARKET_TZ).strftime("%Y-%m-%d")
+        return {"model": model_path, "scaler": scaler_path, "cutoff": cutoff}
+
+    return {
+        "model": os.path.join(model_dir, manifest["model"]),
+        "scaler": os.path.join(model_dir, manifest["scaler"]),
+        "cutoff": manifest["cutoff"],
+    }
+
+
+def new_version_dir(model_dir=MODEL_DIR):
+    """
+    Creates an empty directory for a new model/scaler pair inside `model_dir`.
+
+    Returns:
+        tuple: (model_path, scaler_path) to save the new pair to.
+    """
+    stamp = datetime.now(MARKET_TZ).strftime("%Y%m%d_%H%M%S_%f")
+    path = os.path.join(model_dir, "versions", stamp)
+    os.makedirs(path)
+    return os.path.join(path, MODEL_FILE), os.path.join(path, SCALER_FILE)
+
+
+def promote(model_path, scaler_path, cutoff, model_dir=MODEL_DIR):
+    """
+    Makes a model/scaler pair live.
+
+    The pair is switched with a single atomic rename of the manifest, so a reader
+    sees either the old pair or the new one, even if the process is killed half way.
+    Older versions are removed afterwards.
+
+    Args:
+        model_path (str): Path of the new model, from `new_version_dir`.
+        scaler_path (str): Path of the scaler the model was trained with.
+        cutoff (str): Date of the last bar the model was trained on.
+        model_dir (str): Directory of the model the pair belongs to.
+
+    Raises:
+        ValueError: If the pair is not a version of `model_dir`.
+    """
+    version_dir = os.path.dirname(model_path)
+    versions = os.path.join(model_dir, "versions")
+    if os.path.dirname(os.path.abspath(version_dir)) != os.path.abspath(versions):
+        raise ValueError(f"{model_path} is not a version of {model_dir}, create it with new_version_dir.")
+
+    manifest = {
+        "model": os.path.relpath(model_path, model_dir),
+        "scaler": os.path.relpath(scaler_path, model_dir),
+        "cutoff": cutoff,
+    }
+    path = manifest_path(model_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _prune_versions(model_dir, keep=version_dir)
+
+
+def _prune_versions(base, keep):
+    versions = os.path.join(base, "versions")
+    if not os.path.isdir(versions):
+        return
+    for name in os.listdir(versions):
+        path = os.path.join(versions, name)
+        if os.path.abspath(path) != os.path.abspath(keep):
+            shutil.rmtree(path, ignore_errors=True)
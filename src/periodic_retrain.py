@@ -1,9 +1,15 @@
 from fetch_hist_data import get_hist_data
+from model_store import MODEL_PATH, SCALER_PATH, MODEL_DIR, read_manifest, new_version_dir, promote
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
+import numpy as np
 import os
 import joblib
+import tempfile
+
+
+DATA_PATH = "../data/raw/eur_usd_data.csv"
 
 
 def retrain():
@@ -19,6 +25,7 @@ Steps:
 2. Loads the updated dataset from a specified CSV file.
 3. Scales the dataset and saves the scaler for use in predictions.
 4. Retrains the Random Forest model using the scaled data and saves the updated model.
+5. Promotes the new model and scaler through the manifest, recording the training cutoff.
 
 Exceptions:
     Raises exceptions if any step of the retraining process fails, such as file I/O errors 
@@ -29,20 +36,36 @@ Exceptions:
     get_hist_data("eur_usd_data", "EURUSD")
     
     #load the new csv file
-    data = pd.read_csv("../data/raw/eur_usd_data.csv", parse_dates=["date"], index_col="date")
+    data = load_data()
     print(f"Loaded data from {data.index.min()} to {data.index.max()}.")
     
     #scale the dataset and save scaler
-    scaled_train_df = scale_df(data)
+    model_path, scaler_path = new_version_dir()
+    scaled_train_df = scale_df(data, scaler_path)
     print("Data scaled and scaler saved.")
     
-    #retrain model and save model
-    fit_model(scaled_train_df)
+    #retrain model, save it and make it live
+    fit_model(scaled_train_df, model_path)
+    promote(model_path, scaler_path, str(data.index.max()))
     print(f"Model retrained on all available data from {data.index.min().date()} to {data.index.max().date()}.")
-    
-    
-    
-def scale_df(data):
+
+
+
+def load_data(data_path=DATA_PATH):
+    """
+    Loads the raw daily OHLC history used for training.
+
+    Args:
+        data_path (str): Path to the raw CSV file.
+
+    Returns:
+        pd.DataFrame: Daily bars indexed by date, sorted oldest first.
+    """
+    data = pd.read_csv(data_path, parse_dates=["date"], index_col="date")
+    return data.sort_index()
+
+
+def scale_df(data, scaler_path=SCALER_PATH):
     """
 Scales the dataset and saves the scaler for deployment.
 
@@ -52,6 +75,7 @@ is included in scaling to maintain consistency with the training pipeline.
 
 Args:
     data (pd.DataFrame): The input dataset to scale. Each column is treated as a feature.
+    scaler_path (str): Path to save the fitted scaler.
 
 Returns:
     pd.DataFrame: A DataFrame containing the scaled features, with the same structure as the input data.
@@ -62,21 +86,20 @@ Returns:
     scaled_train = scaler.fit_transform(data)
     scaled_train = pd.DataFrame(scaled_train, columns=data.columns, index=data.index)
     #save scalar for deployment
-    scaler_directory = "../models/EURUSD_daily/"
-    scaler_filename = "eurusd_scaler"
-    scaler_path = os.path.join(scaler_directory, scaler_filename)
+    os.makedirs(os.path.dirname(scaler_path), exist_ok=True)
     joblib.dump(scaler, scaler_path)
     
     return scaled_train
 
 
-def fit_model(data, save_path="../models/EURUSD_daily/rf_model_full_138.joblib"):
+def fit_model(data, save_path=MODEL_PATH, n_jobs=None):
     """
     Retrains a RandomForestRegressor model on the provided data and saves the model.
 
     Args:
         data (pd.DataFrame): Scaled training data, with features and target.
         save_path (str): Path to save the retrained model.
+        n_jobs (int, optional): Number of cores the forest may use. None uses a single core.
     """
     try:
         print("Starting model retraining...")
@@ -101,7 +124,7 @@ def fit_model(data, save_path="../models/EURUSD_daily/rf_model_full_138.joblib")
             'min_weight_fraction_leaf': 0.0,
             'monotonic_cst': None,
             'n_estimators': 200,
-            'n_jobs': None,
+            'n_jobs': n_jobs,
             'oob_score': False,
             'random_state': 42,
             'verbose': 0,
@@ -120,4 +143,118 @@ def fit_model(data, save_path="../models/EURUSD_daily/rf_model_full_138.joblib")
 
     except Exception as e:
         print(f"Error during model retraining: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def split_holdout(data, holdout_bars=20):
+    """
+    Splits the bar history into a training set and a most-recent holdout set.
+
+    Args:
+        data (pd.DataFrame): Unscaled bars sorted oldest first.
+        holdout_bars (int): Number of most recent bars kept aside for validation.
+
+    Returns:
+        tuple: (train_df, holdout_df)
+    """
+    if len(data) <= holdout_bars:
+        raise ValueError(f"Need more than {holdout_bars} bars to build a holdout, got {len(data)}.")
+    return data.iloc[:-holdout_bars], data.iloc[-holdout_bars:]
+
+
+def evaluate_model(model_path, scaler_path, holdout):
+    """
+    Scores a saved model/scaler pair on unscaled holdout data.
+
+    Each model is evaluated with its own scaler and the error is measured in price
+    units, so models fitted on different scalers can be compared directly.
+
+    Args:
+        model_path (str): Path to the saved model.
+        scaler_path (str): Path to the scaler the model was trained with.
+        holdout (pd.DataFrame): Unscaled holdout bars with Open, High, Low and Close.
+
+    Returns:
+        float: Mean squared error of the predicted closing prices.
+    """
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+
+    scaled = pd.DataFrame(scaler.transform(holdout), columns=holdout.columns, index=holdout.index)
+    scaled_pred = model.predict(scaled.drop(columns=["Close"]))
+
+    # Undo the Close column scaling only, the other columns are irrelevant here
+    close_idx = list(holdout.columns).index("Close")
+    pred = scaled_pred * scaler.scale_[close_idx] + scaler.mean_[close_idx]
+    return float(np.mean((pred - holdout["Close"].to_numpy()) ** 2))
+
+
+def retrain_candidate(model_dir=MODEL_DIR, holdout_bars=20, n_jobs=1, data_path=DATA_PATH,
+                      model_path=None, scaler_path=None):
+    """
+    Trains a candidate model and promotes it only if it beats the incumbent.
+
+    A validation model is fitted on all but the last `holdout_bars` bars, and both
+    it and the incumbent are scored on those bars. This is only fair if the holdout
+    starts after the incumbent's training cutoff, so the retrain is skipped until
+    enough unseen bars have arrived. The holdout only decides go/no-go: the promoted
+    model and scaler are refitted on every bar.
+
+    Args:
+        model_dir (str): Directory of the live model, see `model_store`. Every bar
+                         interval needs its own directory.
+        holdout_bars (int): Number of most recent bars used for validation, in bars
+                            of `data_path`, e.g. 20 bars of a 1h file are 20 hours.
+        n_jobs (int): Number of cores the forest may use.
+        data_path (str): CSV of bars to train on, e.g. an intraday file written by `CsvBarStore`.
+        model_path (str, optional): Legacy live model, used while there is no manifest yet.
+        scaler_path (str, optional): Legacy live scaler, used while there is no manifest yet.
+
+    Returns:
+        bool: True if the candidate was promoted, False otherwise.
+    """
+    if not os.path.exists(data_path):
+        print(f"No bars at {data_path} yet. Nothing to train on.")
+        return False
+    data = load_data(data_path)
+    # Train on at least as many bars as are held out
+    if len(data) < 2 * holdout_bars:
+        print(f"Only {len(data)} bars in {data_path}, need {2 * holdout_bars} to train and validate.")
+        return False
+    train, holdout = split_holdout(data, holdout_bars)
+    incumbent = read_manifest(model_dir, model_path, scaler_path)
+
+    if incumbent and incumbent["cutoff"] and pd.Timestamp(incumbent["cutoff"]) >= train.index.max():
+        print(f"Live model was trained up to {incumbent['cutoff']}, fewer than {holdout_bars} "
+              f"unseen bars to validate on. Keeping current model.")
+        return False
+
+    print(f"Validating candidate trained on {train.index.min()} to {train.index.max()}, "
+          f"holding out {len(holdout)} bars.")
+    os.makedirs(model_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=model_dir) as tmp_dir:
+        val_model_path = os.path.join(tmp_dir, "model.joblib")
+        val_scaler_path = os.path.join(tmp_dir, "scaler")
+        fit_model(scale_df(train, val_scaler_path), val_model_path, n_jobs=n_jobs)
+        cand_mse = evaluate_model(val_model_path, val_scaler_path, holdout)
+
+    incumbent_mse = float("inf")
+    if incumbent is None:
+        print("No live model yet, promoting candidate.")
+    else:
+        try:
+            incumbent_mse = evaluate_model(incumbent["model"], incumbent["scaler"], holdout)
+        except Exception as e:
+            print(f"Could not evaluate incumbent model ({e}), promoting candidate.")
+
+    print(f"Holdout MSE - candidate: {cand_mse:.8f}, incumbent: {incumbent_mse:.8f}")
+    if cand_mse >= incumbent_mse:
+        print("Candidate did not beat incumbent, keeping current model.")
+        return False
+
+    # Refit on every bar so the live model also learns from the holdout
+    new_model_path, new_scaler_path = new_version_dir(model_dir)
+    fit_model(scale_df(data, new_scaler_path), new_model_path, n_jobs=n_jobs)
+    promote(new_model_path, new_scaler_path, str(data.index.max()), model_dir)
+    print(f"Candidate refitted on all bars up to {data.index.max()} and promoted to {new_model_path}")
+    return True
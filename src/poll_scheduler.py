@@ -0,0 +1,228 @@
+from collections import deque
+from datetime import datetime, timedelta
+from market_time import MARKET_TZ, MARKET_CLOSE_HOUR
+import csv
+import math
+import os
+
+
+# Days the FX market is effectively closed every year, as (month, day)
+FX_HOLIDAYS = {(1, 1), (12, 25)}
+DECISION_FIELDS = ["time", "market_open", "time_to_close", "volatility", "requests_left", "delay", "reason"]
+
+
+class PollScheduler:
+    """
+    Decides how long the live loop should wait before the next price poll.
+
+    The daily session runs from midnight to the 23:00 SAST close on weekdays,
+    matching the candle `get_countdown` counts down to. Outside the session
+    polling is suspended until the next open. Inside it the base interval is
+    tightened as the close approaches and when recent prices are volatile, but
+    never below what the daily request budget allows.
+    """
+
+    def __init__(self, base_interval=180, min_interval=30, close_ramp_mins=60,
+                 vol_window=20, vol_threshold=0.0005, max_requests_per_day=600,
+                 max_sleep=3600, holidays=None, history=500, log_path=None):
+        """
+        Initialize the PollScheduler.
+
+        Args:
+            base_interval (int): Seconds between polls in a calm market, far from the close.
+            min_interval (int): Shortest allowed interval in seconds.
+            close_ramp_mins (int): Minutes before the close where the interval starts to shrink.
+            vol_window (int): Number of recent prices used to estimate volatility.
+            vol_threshold (float): Std of log returns per poll above which polling speeds up.
+            max_requests_per_day (int): Global HTTP request budget per trading session.
+            max_sleep (int): Longest single sleep while the market is closed, in seconds.
+            holidays (set): Extra datetime.date objects on which the market is closed.
+            history (int): Number of past decisions kept in memory, see `recent_decisions`.
+            log_path (str, optional): CSV every decision is appended to for offline tuning.
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.close_ramp_secs = close_ramp_mins * 60
+        self.vol_threshold = vol_threshold
+        self.max_requests_per_day = max_requests_per_day
+        self.max_sleep = max_sleep
+        self.holidays = set(holidays or ())
+        self.log_path = log_path
+
+        self.prices = deque(maxlen=vol_window)
+        self.decisions = deque(maxlen=history)
+        self.session_date = None
+        self.requests_today = 0
+
+
+    def is_trading_day(self, day):
+        """
+        Check whether the given date has a trading session.
+
+        Args:
+            day (datetime.date): Date in market time.
+
+        Returns:
+            bool: False on weekends and holidays, True otherwise.
+        """
+        if day.weekday() >= 5:
+            return False
+        return (day.month, day.day) not in FX_HOLIDAYS and day not in self.holidays
+
+
+    def is_open(self, now=None):
+        """
+        Check whether the market is currently in a trading session.
+        """
+        now = now or datetime.now(MARKET_TZ)
+        return self.is_trading_day(now.date()) and now.hour < MARKET_CLOSE_HOUR
+
+
+    def next_open(self, now=None):
+        """
+        Start (midnight, market time) of the next trading session after `now`.
+        """
+        now = now or datetime.now(MARKET_TZ)
+        day = now.date() + timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return datetime(day.year, day.month, day.day, tzinfo=MARKET_TZ)
+
+
+    def seconds_to_close(self, now=None):
+        """
+        Seconds remaining until today's close, 0 if the close has passed.
+        """
+        now = now or datetime.now(MARKET_TZ)
+        close = now.replace(hour=MARKET_CLOSE_HOUR, minute=0, second=0, microsecond=0)
+        return max(0.0, (close - now).total_seconds())
+
+
+    def record_request(self, price=None, now=None, attempts=1):
+        """
+        Count a poll against the daily budget and feed its price to the volatility estimate.
+
+        Args:
+            price (float, optional): Price returned by the poll, None if it failed.
+            attempts (int): HTTP requests the poll actually made, including retries.
+        """
+        self._roll_session(now or datetime.now(MARKET_TZ))
+        self.requests_today += attempts
+        if price:
+            self.prices.append(price)
+
+
+    def volatility(self):
+        """
+        Standard deviation of the log returns between recent polls.
+
+        Returns:
+            float: Volatility per poll, 0.0 if there are too few prices.
+        """
+        if len(self.prices) < 3:
+            return 0.0
+        prices = list(self.prices)
+        returns = [math.log(b / a) for a, b in zip(prices, prices[1:])]
+        mean = sum(returns) / len(returns)
+        return math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - 1))
+
+
+    def next_poll(self, now=None):
+        """
+        Decide how long to wait before the next poll.
+
+        The decision is kept in memory and appended to `log_path` if set, so the
+        scheduler can be tuned from the recorded history.
+
+        Returns:
+            dict: Decision with the delay in seconds and the factors behind it.
+        """
+        now = now or datetime.now(MARKET_TZ)
+        self._roll_session(now)
+        decision = {
+            "time": now,
+            "market_open": self.is_open(now),
+            "time_to_close": self.seconds_to_close(now),
+            "volatility": self.volatility(),
+            "requests_left": max(0, self.max_requests_per_day - self.requests_today),
+        }
+
+        if not decision["market_open"]:
+            until_open = (self.next_open(now) - now).total_seconds()
+            decision["delay"] = max(1.0, min(until_open, self.max_sleep))
+            decision["reason"] = "market closed"
+            self._record(decision)
+            return decision
+
+        delay = self.base_interval
+        reason = "base interval"
+
+        remaining = decision["time_to_close"]
+        if remaining < self.close_ramp_secs:
+            close_delay = self.base_interval * remaining / self.close_ramp_secs
+            if close_delay < delay:
+                delay, reason = close_delay, "close approaching"
+
+        vol = decision["volatility"]
+        if vol > self.vol_threshold:
+            vol_delay = self.base_interval * self.vol_threshold / vol
+            if vol_delay < delay:
+                delay, reason = vol_delay, "high volatility"
+
+        if delay < self.min_interval:
+            delay = self.min_interval
+
+        # Spread the remaining budget over the rest of the session
+        budget_delay = remaining / max(decision["requests_left"], 1)
+        if budget_delay > delay:
+            delay, reason = budget_delay, "request budget"
+
+        decision["delay"] = delay
+        decision["reason"] = reason
+        self._record(decision)
+        return decision
+
+
+    def recent_decisions(self, n=None):
+        """
+        Most recent decisions, oldest first.
+
+        Args:
+            n (int, optional): Number of decisions to return, all kept ones if None.
+
+        Returns:
+            list: Decision dicts as returned by `next_poll`.
+        """
+        decisions = list(self.decisions)
+        return decisions if n is None else decisions[-n:]
+
+
+    def _record(self, decision):
+        """
+        Keep a decision in memory and append it to the decision log, if any.
+        """
+        self.decisions.append(decision)
+        if not self.log_path:
+            return
+        try:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            new_file = not os.path.exists(self.log_path)
+            with open(self.log_path, "a", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=DECISION_FIELDS)
+                if new_file:
+                    writer.writeheader()
+                writer.writerow({**decision, "time": decision["time"].isoformat()})
+        except OSError as e:
+            print(f"Could not log poll decision: {e}")
+
+
+    def _roll_session(self, now):
+        """
+        Reset the daily budget and price history when a new session starts.
+        """
+        if now.date() != self.session_date:
+            self.session_date = now.date()
+            self.requests_today = 0
+            self.prices.clear()
@@ -0,0 +1,235 @@
+from fetch_hist_data import get_hist_data
+from market_time import MARKET_TZ
+from datetime import datetime
+from periodic_retrain import retrain_candidate, DATA_PATH
+from model_store import MODEL_DIR, manifest_path
+import multiprocessing
+import threading
+import time
+import os
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class RetrainWorker:
+    """
+    Retrains the model in the background while the live loop keeps predicting.
+
+    A lightweight scheduler thread watches for new bars and a retrain
+    interval. Each retrain runs in its own low-priority child process with CPU
+    and memory caps, validates the candidate against the incumbent on bars neither
+    was trained on and only promotes it if it is better. `TradeBot.reload_if_updated`
+    then picks up the promoted model.
+    """
+
+    def __init__(self, interval_hours=24, poll_minutes=60, holdout_bars=20,
+                 max_cores=1, max_memory_mb=4096, max_cpu_secs=1800, niceness=19,
+                 fetch_data=True, max_fetches_per_day=3, data_path=DATA_PATH, model_dir=MODEL_DIR,
+                 model_path=None, scaler_path=None):
+        """
+        Initialize the RetrainWorker.
+
+        Args:
+            interval_hours (float): Retrain at least this often, even without new bars.
+            poll_minutes (float): How often to check for new bars.
+            holdout_bars (int): Number of most recent bars of `data_path` used to validate
+                                the candidate, e.g. 20 bars of a 1h file are 20 hours.
+            max_cores (int): Number of CPU cores the retrain process may use.
+            max_memory_mb (int): Address space cap for the retrain process, None to disable.
+            max_cpu_secs (int): CPU time cap for one retrain, None to disable.
+            niceness (int): Scheduling niceness added to the retrain process.
+            fetch_data (bool): Fetch new daily bars from Alpha Vantage, once per market day.
+            max_fetches_per_day (int): Fetch attempts per market day before giving up until the next day.
+            data_path (str): CSV of bars to train on. Intraday models point this at a
+                             `CsvBarStore` file and disable `fetch_data`.
+            model_dir (str): Directory of the live model the candidate competes with.
+                             Every bar interval needs its own directory.
+            model_path (str, optional): Legacy live model, used while there is no manifest yet.
+            scaler_path (str, optional): Legacy live scaler, used while there is no manifest yet.
+        """
+        self.interval_secs = interval_hours * 3600
+        self.poll_secs = poll_minutes * 60
+        self.holdout_bars = holdout_bars
+        self.max_cores = max_cores
+        self.max_memory_mb = max_memory_mb
+        self.max_cpu_secs = max_cpu_secs
+        self.niceness = niceness
+        self.fetch_data = fetch_data
+        self.max_fetches_per_day = max_fetches_per_day
+        self.data_path = data_path
+        self.model_dir = model_dir
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+
+        self.last_bar_date = None
+        self.last_fetch_date = None
+        self.fetch_day = None
+        self.fetch_attempts = 0
+        self.last_retrain = self._model_mtime()
+        self._stop = threading.Event()
+        self._thread = None
+        self._process = None
+
+
+    def start(self):
+        """
+        Start the scheduler thread. The thread is a daemon, so it never keeps
+        the live process alive on its own.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retrain-worker", daemon=True)
+        self._thread.start()
+
+
+    def stop(self, timeout=None):
+        """
+        Stop the scheduler and terminate a retrain that is still running.
+        """
+        self._stop.set()
+        if self._process and self._process.is_alive():
+            self._process.terminate()
+        if self._thread:
+            self._thread.join(timeout)
+
+
+    def _run(self):
+        self.last_bar_date = self._latest_bar_date()
+        while not self._stop.is_set():
+            try:
+                reason = self._check_trigger()
+                if reason:
+                    print(f"Retrain triggered: {reason}")
+                    self._retrain()
+            except Exception as e:
+                print(f"Retrain worker error: {e}")
+            self._stop.wait(self.poll_secs)
+
+
+    def _check_trigger(self):
+        """
+        Decide whether a retrain is due.
+
+        Returns:
+            str or None: Reason for retraining, or None if no retrain is due.
+        """
+        if self.fetch_data:
+            self._fetch_daily_bars()
+
+        bar_date = self._latest_bar_date()
+        if bar_date and self.last_bar_date and bar_date > self.last_bar_date:
+            return f"new bars up to {bar_date}"
+        if self.last_retrain is None or time.time() - self.last_retrain >= self.interval_secs:
+            return "retrain interval elapsed"
+        return None
+
+
+    def _fetch_daily_bars(self):
+        """
+        Fetch new daily bars once per market day. A failed fetch is retried on the
+        next poll, up to `max_fetches_per_day` attempts, since the free API tier
+        only allows ~25 calls a day.
+        """
+        today = datetime.now(MARKET_TZ).date()
+        if today == self.last_fetch_date:
+            return
+        if today != self.fetch_day:
+            self.fetch_day = today
+            self.fetch_attempts = 0
+        if self.fetch_attempts >= self.max_fetches_per_day:
+            return
+
+        self.fetch_attempts += 1
+        try:
+            get_hist_data("eur_usd_data", "EURUSD")
+        except (Exception, SystemExit) as e:
+            print(f"Could not fetch new daily bars (attempt {self.fetch_attempts}/"
+                  f"{self.max_fetches_per_day}): {e}")
+            return
+        self.last_fetch_date = today
+
+
+    def _retrain(self):
+        """
+        Run one retrain in a capped child process and wait for it to finish.
+        """
+        # Spawn rather than fork: the live process runs other threads (scheduler,
+        # dashboard) whose held locks a forked child would inherit
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_retrain_process,
+            args=(self.model_dir, self.data_path, self.model_path, self.scaler_path,
+                  self.holdout_bars, self.max_cores, self.max_memory_mb, self.max_cpu_secs,
+                  self.niceness),
+            name="retrain",
+            daemon=True,
+        )
+        self._process.start()
+        self._process.join()
+
+        if self._process.exitcode != 0:
+            print(f"Retrain process failed with exit code {self._process.exitcode}")
+        # Count failed runs too, so a broken retrain does not loop every poll
+        self.last_retrain = time.time()
+        self.last_bar_date = self._latest_bar_date()
+
+
+    def _latest_bar_date(self):
+        """
+        Date column of the last line in the data file, or None if it cannot be read.
+        """
+        try:
+            with open(self.data_path, "rb") as f:
+                f.seek(max(0, os.path.getsize(self.data_path) - 4096))
+                lines = f.read().splitlines()
+            return lines[-1].decode().split(",")[0] if len(lines) > 1 else None
+        except (OSError, IndexError, UnicodeDecodeError):
+            return None
+
+
+    def _model_mtime(self):
+        for path in (manifest_path(self.model_dir), self.model_path):
+            if path is None:
+                continue
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                continue
+        return None
+
+
+
+def _retrain_process(model_dir, data_path, model_path, scaler_path, holdout_bars,
+                     max_cores, max_memory_mb, max_cpu_secs, niceness):
+    """
+    Entry point of the retrain child process. Applies the resource caps before
+    any training starts, then trains, validates and possibly promotes a candidate.
+    """
+    _apply_limits(max_cores, max_memory_mb, max_cpu_secs, niceness)
+    promoted = retrain_candidate(model_dir, holdout_bars=holdout_bars, n_jobs=max_cores,
+                                 data_path=data_path, model_path=model_path, scaler_path=scaler_path)
+    print("Retrain finished, model promoted." if promoted else "Retrain finished, model unchanged.")
+
+
+def _apply_limits(max_cores, max_memory_mb, max_cpu_secs, niceness):
+    """
+    Lower the priority of the current process and cap its CPU and memory use.
+    Limits the platform does not support are skipped.
+    """
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+    if max_cores and hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, cores[-max_cores:])
+
+    if resource is None:
+        return
+    if max_memory_mb:
+        mem_bytes = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (mem_bytes, mem_bytes))
+    if max_cpu_secs:
+        resource.setrlimit(resource.RLIMIT_CPU, (max_cpu_secs, max_cpu_secs))
@@ -0,0 +1,171 @@
+import random
+import time
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a call is refused because the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing upstream after repeated failures.
+
+    The breaker opens after `failure_threshold` consecutive failures and refuses
+    calls for `reset_timeout` seconds. It then goes half-open and lets a single
+    probe through: a success closes it again, a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=120, clock=time.monotonic):
+        """
+        Initialize the CircuitBreaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the breaker.
+            reset_timeout (float): Seconds the breaker stays open before probing.
+            clock (callable): Monotonic clock, replaceable for testing.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+
+    def allow(self):
+        """
+        Check whether a call may go through right now.
+
+        Returns:
+            bool: True if the call is allowed, False if the breaker refuses it.
+        """
+        if self.state == self.OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+
+        if self.state == self.HALF_OPEN:
+            # Only one probe at a time while half-open
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+
+    def release(self):
+        """
+        Free the half-open probe slot without recording an outcome, e.g. when the
+        call failed for a reason unrelated to the upstream.
+        """
+        self._probing = False
+
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+        self._probing = False
+
+
+
+class RetryPolicy:
+    """
+    Single retry policy for upstream fetches.
+
+    Every call gets an end-to-end deadline that covers all attempts and sleeps.
+    Retries draw from a token bucket shared across calls that is refilled by
+    successes, so a long outage quickly stops producing retries. All attempts go
+    through a circuit breaker.
+    """
+
+    def __init__(self, deadline=20, attempt_timeout=10, backoff=1, max_backoff=8,
+                 retry_budget=10, budget_refill=0.2, breaker=None, clock=time.monotonic,
+                 sleep=time.sleep):
+        """
+        Initialize the RetryPolicy.
+
+        Args:
+            deadline (float): Seconds one call may take including all retries.
+            attempt_timeout (float): Longest timeout of a single attempt in seconds.
+            backoff (float): First backoff in seconds, doubled after each retry.
+            max_backoff (float): Longest single backoff in seconds.
+            retry_budget (float): Maximum number of retry tokens in the shared bucket.
+            budget_refill (float): Tokens returned to the bucket per successful call.
+            breaker (CircuitBreaker): Breaker guarding the upstream, a default one if None.
+            clock (callable): Monotonic clock, replaceable for testing.
+            sleep (callable): Sleep function used for backoff, replaceable for testing.
+        """
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_budget = retry_budget
+        self.budget_refill = budget_refill
+        self.tokens = retry_budget
+        self.last_attempts = 0
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.clock = clock
+        self.sleep = sleep
+
+
+    def call(self, func, retry_on=(Exception,)):
+        """
+        Call `func(timeout)` until it succeeds, the deadline passes, the retry
+        budget runs out or the breaker opens. The number of times `func` was
+        actually called is left in `self.last_attempts`, 0 if the breaker refused.
+
+        Args:
+            func (callable): Takes the timeout in seconds for this attempt.
+            retry_on (tuple): Exception types that count as upstream failures.
+
+        Returns:
+            The return value of `func`.
+
+        Raises:
+            CircuitOpenError: If the breaker refuses the call.
+            Exception: The last failure once no further retry is possible.
+        """
+        end = self.clock() + self.deadline
+        delay = self.backoff
+        self.last_attempts = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit breaker is {self.breaker.state}, call refused.")
+
+            remaining = end - self.clock()
+            self.last_attempts += 1
+            try:
+                result = func(max(0.1, min(self.attempt_timeout, remaining)))
+            except retry_on:
+                self.breaker.record_failure()
+                sleep = random.uniform(0, delay)
+                remaining = end - self.clock()
+                if self.tokens < 1 or sleep >= remaining or self.breaker.state == CircuitBreaker.OPEN:
+                    raise
+                self.tokens -= 1
+                self.sleep(sleep)
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            except BaseException:
+                # Not an upstream failure, but a half-open breaker must not keep waiting for this probe
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            self.tokens = min(self.retry_budget, self.tokens + self.budget_refill)
+            return result
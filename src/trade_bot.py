@@ -1,4 +1,6 @@
+from model_store import MODEL_PATH, SCALER_PATH, MODEL_DIR, manifest_path, read_manifest
 import joblib
+import os
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 import pandas as pd
@@ -10,18 +12,24 @@ class TradeBot:
     Provides methods to make predictions and retrieve prediction accuracy.
     """
 
-    def __init__(self):
+    def __init__(self, model_dir=MODEL_DIR, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
         """
         Initialize the TradingBot instance.
 
         Args:
-            model_path (str): Path to the trained Random Forest model (.joblib file).
-            scaler_path (str): Path to the trained StandardScaler (.joblib file).
+            model_dir (str): Directory whose manifest names the live model and scaler, see `model_store`.
+            model_path (str, optional): Path to the trained Random Forest model (.joblib file),
+                                        used while there is no manifest yet.
+            scaler_path (str, optional): Path to the trained StandardScaler (.joblib file),
+                                         used while there is no manifest yet.
         """
-        self.model_path = "../models/EURUSD_daily/rf_model_full_138.joblib"
-        self.scaler_path = "../models/EURUSD_daily/eurusd_scaler"
+        self.model_dir = model_dir
+        self.default_model_path = model_path
+        self.default_scaler_path = scaler_path
+        self.model_path, self.scaler_path = self._live_paths()
         self.model = self._load_model()
         self.scaler = self._load_scaler()
+        self.model_mtime = self._model_mtime()
         
 
     def _load_model(self):
@@ -52,6 +60,59 @@ class TradeBot:
             raise ValueError(f"Error loading scaler: {e}")
 
 
+    def _live_paths(self):
+        """
+        Model and scaler paths named by the manifest, or the defaults without one.
+        """
+        live = read_manifest(self.model_dir, self.default_model_path, self.default_scaler_path)
+        if live is None:
+            return self.default_model_path, self.default_scaler_path
+        return live["model"], live["scaler"]
+
+
+    def _model_mtime(self):
+        """
+        Modification time of the manifest, or of the model file while there is no
+        manifest. None if neither can be read.
+        """
+        for path in (manifest_path(self.model_dir), self.default_model_path):
+            if path is None:
+                continue
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                continue
+        return None
+
+
+    def reload_if_updated(self):
+        """
+        Reload the model and scaler if a new pair was promoted on disk,
+        e.g. by the background retrain worker.
+        The current model keeps serving if the reload fails.
+
+        Returns:
+            bool: True if a new model was loaded, False otherwise.
+        """
+        mtime = self._model_mtime()
+        if mtime is None or mtime == self.model_mtime:
+            return False
+
+        old_paths = self.model_path, self.scaler_path
+        try:
+            self.model_path, self.scaler_path = self._live_paths()
+            model = self._load_model()
+            scaler = self._load_scaler()
+        except (ValueError, OSError, KeyError) as e:
+            self.model_path, self.scaler_path = old_paths
+            print(f"Keeping current model, reload failed: {e}")
+            return False
+
+        self.model, self.scaler, self.model_mtime = model, scaler, mtime
+        print(f"Reloaded model from {self.model_path}")
+        return True
+
+
     def scale(self, data):
         """
         Extract and scale the features for prediction.
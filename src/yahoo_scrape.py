@@ -3,31 +3,32 @@ from requests.exceptions import RequestException
 import time
 import logging
 from bs4 import BeautifulSoup
+from retry_policy import RetryPolicy, CircuitOpenError
 
 
 class BaseScrape:
     """
     Base class for web scrapers to handle HTTP requests and retries.
     """
-    def __init__(self, headers=None, max_retries=3, retry_delay=2):
+    def __init__(self, headers=None, policy=None):
         """
         Initialize the BaseScraper.
 
         Args:
             headers (dict): HTTP headers for requests (e.g., user-agent).
-            max_retries (int): Maximum number of retries for failed requests.
-            retry_delay (int): Delay (in seconds) between retries.
+            policy (RetryPolicy): Deadline, retry budget and circuit breaker shared by
+                                  all requests of this scraper. A default policy if None.
         """
         self.headers = headers or {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        self.max_retries = max_retries
-        self.retry_delay = retry_delay
+        self.policy = policy or RetryPolicy()
         
 
     def fetch_html(self, url):
         """
-        Fetch HTML content from a given URL with retry logic.
+        Fetch HTML content from a given URL, retrying within the policy's deadline
+        and retry budget.
 
         Args:
             url (str): The URL to fetch.
@@ -36,21 +37,19 @@ class BaseScrape:
             str: HTML content of the response.
 
         Raises:
-            RequestException: If the request fails after retries.
+            RequestException: If the request still fails when no retry is left.
+            CircuitOpenError: If the circuit breaker refuses the request.
         """
-        attempts = 0
-        while attempts < self.max_retries:
+        def attempt(timeout):
             try:
-                response = requests.get(url, headers=self.headers, timeout=10)
+                response = requests.get(url, headers=self.headers, timeout=timeout)
                 response.raise_for_status()  # Raise HTTPError for bad responses
                 return response.text
             except RequestException as e:
-                attempts += 1
-                logging.warning(f"Request failed (attempt {attempts}/{self.max_retries}): {e}")
-                time.sleep(self.retry_delay)
-        
-        # If all retries fail, raise an exception
-        raise RequestException(f"Failed to fetch HTML after {self.max_retries} attempts: {url}")
+                logging.warning(f"Request failed: {e}")
+                raise
+
+        return self.policy.call(attempt, retry_on=(RequestException,))
     
     
     
@@ -68,6 +67,7 @@ class YahooFinScrape(BaseScrape):
         """
         super().__init__(**kwargs)
         self.base_url = base_url
+        self.last_quotes = {}
 
     def _construct_url(self, ticker):
         """
@@ -153,6 +153,30 @@ class YahooFinScrape(BaseScrape):
         url = self._construct_url(ticker)
         html_content = self.fetch_html(url)
         return self.parse_ticker_data(html_content)
+
+    def get_quote(self, ticker):
+        """
+        Fetch the latest quote, falling back to the last known quote if the fetch
+        fails or the circuit breaker is open.
+
+        Args:
+            ticker (str): Ticker symbol (e.g., "BTC-USD").
+
+        Returns:
+            dict or None: Ticker data with a "stale" flag and its "age" in seconds,
+                          or None if no quote was ever fetched.
+        """
+        try:
+            data = self.get_ticker_data(ticker)
+        except (RequestException, CircuitOpenError, ValueError) as e:
+            logging.warning(f"Fetch failed for {ticker}: {e}")
+            if ticker not in self.last_quotes:
+                return None
+            fetched_at, last = self.last_quotes[ticker]
+            return {**last, "stale": True, "age": time.time() - fetched_at}
+
+        self.last_quotes[ticker] = (time.time(), data)
+        return {**data, "stale": False, "age": 0.0}
     
     
 #Test client
@@ -0,0 +1,99 @@
+import csv
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bar_resampler import BarBuffer, BarResampler, CsvBarStore
+from market_time import MARKET_TZ
+
+
+def ts(*args):
+    return datetime(*args, tzinfo=MARKET_TZ).timestamp()
+
+
+def test_buckets_align_to_market_time_boundaries():
+    resampler = BarResampler(intervals=("15m", "1d"))
+    resampler.update(1.1, ts(2026, 10, 19, 10, 7, 30))
+
+    assert resampler.current_bar("15m")["date"] == datetime(2026, 10, 19, 10, 0, tzinfo=MARKET_TZ)
+    # Daily bars start at midnight SAST, not at midnight UTC
+    assert resampler.current_bar("1d")["date"] == datetime(2026, 10, 19, tzinfo=MARKET_TZ)
+
+
+def test_daily_bar_closes_at_market_midnight():
+    resampler = BarResampler(intervals=("1d",))
+    resampler.update(1.1, ts(2026, 10, 19, 23, 30))
+    # 22:10 UTC on the same UTC day, but already the next market day
+    completed = resampler.update(1.2, ts(2026, 10, 20, 0, 10))
+
+    assert [(interval, bar["date"]) for interval, bar in completed] == [
+        ("1d", datetime(2026, 10, 19, tzinfo=MARKET_TZ))]
+
+
+def test_ohlc_aggregates_until_the_boundary():
+    resampler = BarResampler(intervals=("1m",))
+    for second, price in ((0, 1.10), (15, 1.13), (30, 1.09), (59, 1.11)):
+        assert resampler.update(price, ts(2026, 10, 19, 10, 0, second)) == []
+    completed = resampler.update(1.20, ts(2026, 10, 19, 10, 1))
+
+    assert completed == [("1m", {
+        "date": datetime(2026, 10, 19, 10, 0, tzinfo=MARKET_TZ),
+        "Open": 1.10, "High": 1.13, "Low": 1.09, "Close": 1.11,
+    })]
+    # The quote on the boundary opens the next bar
+    bar = resampler.current_bar("1m")
+    assert bar["date"] == datetime(2026, 10, 19, 10, 1, tzinfo=MARKET_TZ)
+    assert bar["Open"] == bar["Close"] == 1.20
+
+
+def test_ring_buffer_keeps_latest_bars_oldest_first():
+    buf = BarBuffer(60, capacity=3)
+    start = ts(2026, 10, 19, 10)
+    for i in range(5):
+        buf.update(1.0 + i, start + i * 60, 7200)
+    buf.flush(start + 5 * 60)
+
+    # Five bars through a ring of three: head has wrapped to index 2
+    assert buf.head == 2
+    bars = buf.bars()
+    assert bars.shape == (3, 6)
+    np.testing.assert_array_equal(bars[:, BarBuffer.TIME], [start + 120, start + 180, start + 240])
+    np.testing.assert_array_equal(bars[:, BarBuffer.CLOSE], [3.0, 4.0, 5.0])
+
+
+def test_bars_before_the_ring_is_full():
+    buf = BarBuffer(60, capacity=3)
+    start = ts(2026, 10, 19, 10)
+    buf.update(1.0, start, 7200)
+    buf.update(2.0, start + 60, 7200)
+
+    np.testing.assert_array_equal(buf.bars()[:, BarBuffer.CLOSE], [1.0])
+
+
+def test_flush_only_closes_ended_intervals():
+    resampler = BarResampler(intervals=("1m", "1h"))
+    resampler.update(1.1, ts(2026, 10, 19, 10, 0, 30))
+
+    assert resampler.flush(ts(2026, 10, 19, 10, 0, 59)) == []
+    completed = resampler.flush(ts(2026, 10, 19, 10, 1))
+    assert [interval for interval, _ in completed] == ["1m"]
+    assert resampler.current_bar("1m") is None
+    assert resampler.current_bar("1h") is not None
+
+    assert [interval for interval, _ in resampler.flush(ts(2026, 10, 19, 11))] == ["1h"]
+    assert resampler.flush(ts(2026, 10, 19, 12)) == []
+
+
+def test_csv_header_is_written_once(tmp_path):
+    store = CsvBarStore(str(tmp_path / "intraday"))
+    resampler = BarResampler(intervals=("1m",), sinks=[store])
+    for minute in range(3):
+        resampler.update(1.1 + minute / 100, ts(2026, 10, 19, 10, minute))
+
+    with open(store.path("1m"), newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["date", "Open", "High", "Low", "Close"]
+    assert [row[0] for row in rows[1:]] == ["2026-10-19 10:00:00", "2026-10-19 10:01:00"]
+    assert float(rows[2][4]) == pytest.approx(1.11)
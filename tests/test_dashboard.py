@@ -0,0 +1,47 @@
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pygame")
+
+from dashboard import Dashboard
+
+
+def test_headless_renders_on_push_into_bounded_ring(tmp_path):
+    dashboard = Dashboard(headless=True, frame_dir=str(tmp_path), keep_frames=3, max_frames=7)
+    dashboard.start()
+    try:
+        for i in range(7):
+            dashboard.push_quote(1.05 + i * 1e-4, ts=1760000000 + i)
+            # Wait for the frame of this push before pushing the next one
+            for _ in range(500):
+                if not dashboard._dirty.is_set():
+                    break
+                dashboard._thread.join(0.01)
+        dashboard._thread.join(10)
+    finally:
+        dashboard.stop(timeout=5)
+
+    assert not dashboard._thread.is_alive()
+    assert sorted(os.listdir(tmp_path)) == ["frame_00.png", "frame_01.png", "frame_02.png"]
+
+
+def test_headless_idles_without_pushes(tmp_path):
+    dashboard = Dashboard(headless=True, frame_dir=str(tmp_path))
+    dashboard.start()
+    dashboard._thread.join(0.5)
+    dashboard.stop(timeout=5)
+    assert os.listdir(tmp_path) == []
+
+
+def test_window_runs_on_calling_thread_until_stopped(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    dashboard = Dashboard()
+    with pytest.raises(ValueError):
+        dashboard.start()
+
+    threading.Timer(0.3, dashboard.stop).start()
+    dashboard.run()
+    assert dashboard._thread is None
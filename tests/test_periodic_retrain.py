@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+pytest.importorskip("dotenv")
+pytest.importorskip("alpha_vantage")
+
+import joblib
+from sklearn.dummy import DummyRegressor
+from sklearn.linear_model import LinearRegression
+
+from model_store import manifest_path, new_version_dir, promote, read_manifest
+from periodic_retrain import load_data, retrain_candidate, scale_df
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    """Synthetic daily bars whose close is exactly the mid of high and low."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-01-01", periods=200)
+    open_ = 1.1 + np.cumsum(rng.normal(0, 0.003, len(dates)))
+    high = open_ + rng.uniform(0.001, 0.01, len(dates))
+    low = open_ - rng.uniform(0.001, 0.01, len(dates))
+    df = pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": (high + low) / 2},
+                      index=pd.Index(dates, name="date"))
+    path = tmp_path / "bars.csv"
+    df.to_csv(path)
+    return str(path)
+
+
+def make_incumbent(model_dir, data, model, cutoff):
+    model_path, scaler_path = new_version_dir(model_dir)
+    scaled = scale_df(data, scaler_path)
+    model.fit(scaled[["Open", "High", "Low"]], scaled["Close"])
+    joblib.dump(model, model_path)
+    promote(model_path, scaler_path, cutoff, model_dir)
+    return model_path
+
+
+def test_better_candidate_is_refitted_on_all_bars_and_promoted(tmp_path, data_path):
+    model_dir = str(tmp_path / "models")
+    data = load_data(data_path)
+    old_model = make_incumbent(model_dir, data.iloc[:100], DummyRegressor(), str(data.index[99]))
+
+    assert retrain_candidate(model_dir, holdout_bars=20, data_path=data_path)
+
+    live = read_manifest(model_dir)
+    assert live["cutoff"] == str(data.index.max())
+    assert os.path.exists(live["model"]) and os.path.exists(live["scaler"])
+    assert not os.path.exists(old_model)
+
+
+def test_worse_candidate_is_rejected(tmp_path, data_path):
+    model_dir = str(tmp_path / "models")
+    data = load_data(data_path)
+    # A linear model recovers close = (high + low) / 2 exactly, the forest cannot beat it
+    make_incumbent(model_dir, data.iloc[:100], LinearRegression(), str(data.index[99]))
+    with open(manifest_path(model_dir)) as f:
+        before = json.load(f)
+
+    assert not retrain_candidate(model_dir, holdout_bars=20, data_path=data_path)
+    with open(manifest_path(model_dir)) as f:
+        assert json.load(f) == before
+
+
+def test_retrain_waits_until_holdout_is_after_incumbent_cutoff(tmp_path, data_path):
+    model_dir = str(tmp_path / "models")
+    data = load_data(data_path)
+    make_incumbent(model_dir, data, DummyRegressor(), str(data.index[-5]))
+
+    assert not retrain_candidate(model_dir, holdout_bars=20, data_path=data_path)
+    assert read_manifest(model_dir)["cutoff"] == str(data.index[-5])
+
+
+def test_first_model_is_promoted_without_legacy_fallback(tmp_path, data_path):
+    model_dir = str(tmp_path / "models" / "EURUSD_1h")
+
+    assert retrain_candidate(model_dir, holdout_bars=20, data_path=data_path)
+    assert read_manifest(model_dir)["model"].startswith(os.path.join(model_dir, "versions"))
+
+
+def test_too_few_bars_skip_retrain(tmp_path, data_path):
+    model_dir = str(tmp_path / "models")
+
+    assert not retrain_candidate(model_dir, holdout_bars=150, data_path=data_path)
+    assert not retrain_candidate(model_dir, data_path=str(tmp_path / "missing.csv"))
+    assert read_manifest(model_dir) is None
+
+
+def test_promote_refuses_pair_of_another_model_dir(tmp_path, data_path):
+    data = load_data(data_path)
+    daily_dir, intraday_dir = str(tmp_path / "daily"), str(tmp_path / "intraday")
+    daily_model = make_incumbent(daily_dir, data, DummyRegressor(), str(data.index[-1]))
+    model_path, scaler_path = new_version_dir(intraday_dir)
+
+    with pytest.raises(ValueError):
+        promote(model_path, scaler_path, str(data.index[-1]), daily_dir)
+    assert os.path.exists(daily_model)
@@ -0,0 +1,103 @@
+import csv
+from datetime import datetime
+
+from market_time import MARKET_TZ
+from poll_scheduler import PollScheduler
+
+
+def at(*args):
+    return datetime(*args, tzinfo=MARKET_TZ)
+
+
+def test_is_open_on_weekdays_before_close_only():
+    scheduler = PollScheduler()
+    assert scheduler.is_open(at(2026, 10, 19, 12))
+    assert not scheduler.is_open(at(2026, 10, 17, 12))  # Saturday
+    assert not scheduler.is_open(at(2026, 10, 18, 12))  # Sunday
+    assert not scheduler.is_open(at(2026, 10, 19, 23, 30))  # after the close
+
+
+def test_is_closed_on_holidays():
+    scheduler = PollScheduler(holidays={at(2026, 10, 20).date()})
+    assert not scheduler.is_open(at(2027, 1, 1, 12))
+    assert not scheduler.is_open(at(2026, 12, 25, 12))
+    assert not scheduler.is_open(at(2026, 10, 20, 12))
+
+
+def test_next_open_skips_weekends_and_holidays():
+    scheduler = PollScheduler()
+    assert scheduler.next_open(at(2026, 10, 16, 23, 30)) == at(2026, 10, 19)
+    # Christmas 2026 is a Friday, so the market reopens on Monday the 28th
+    assert scheduler.next_open(at(2026, 12, 24, 23, 30)) == at(2026, 12, 28)
+
+
+def test_closed_market_sleeps_until_open_at_most_max_sleep():
+    scheduler = PollScheduler(max_sleep=3600)
+    decision = scheduler.next_poll(at(2026, 10, 17, 12))
+    assert decision["reason"] == "market closed"
+    assert decision["delay"] == 3600
+
+    decision = scheduler.next_poll(at(2026, 10, 18, 23, 50))
+    assert decision["delay"] == 600
+
+
+def test_base_interval_far_from_close():
+    decision = PollScheduler(base_interval=180).next_poll(at(2026, 10, 19, 12))
+    assert decision["reason"] == "base interval"
+    assert decision["delay"] == 180
+
+
+def test_interval_shrinks_towards_close_down_to_min_interval():
+    scheduler = PollScheduler(base_interval=180, min_interval=30, close_ramp_mins=60)
+    decision = scheduler.next_poll(at(2026, 10, 19, 22, 40))
+    assert decision["reason"] == "close approaching"
+    assert decision["delay"] == 60
+
+    decision = scheduler.next_poll(at(2026, 10, 19, 22, 58))
+    assert decision["delay"] == 30
+
+
+def test_volatility_speeds_up_polling():
+    scheduler = PollScheduler(base_interval=180, min_interval=30, vol_threshold=0.0005)
+    now = at(2026, 10, 19, 12)
+    for i in range(10):
+        scheduler.record_request(1.0 if i % 2 == 0 else 1.001, now=now)
+
+    decision = scheduler.next_poll(now)
+    assert decision["volatility"] > 0.0005
+    assert decision["reason"] == "high volatility"
+    assert 30 < decision["delay"] < 180
+
+
+def test_spent_budget_stretches_interval_to_session_end():
+    scheduler = PollScheduler(max_requests_per_day=5)
+    now = at(2026, 10, 19, 12)
+    scheduler.record_request(1.05, now=now, attempts=5)
+
+    decision = scheduler.next_poll(now)
+    assert decision["requests_left"] == 0
+    assert decision["reason"] == "request budget"
+    assert decision["delay"] == decision["time_to_close"]
+
+
+def test_scheduler_is_charged_for_actual_attempts():
+    scheduler = PollScheduler(max_requests_per_day=10)
+    scheduler.record_request(1.05, attempts=3)
+    scheduler.record_request(None, attempts=0)
+    assert scheduler.requests_today == 3
+
+
+def test_decisions_are_kept_and_logged(tmp_path):
+    log_path = tmp_path / "logs" / "decisions.csv"
+    scheduler = PollScheduler(log_path=str(log_path))
+    scheduler.next_poll(at(2026, 10, 19, 12))
+    scheduler.next_poll(at(2026, 10, 19, 22, 40))
+
+    assert [d["reason"] for d in scheduler.recent_decisions()] == ["base interval", "close approaching"]
+    assert scheduler.recent_decisions(1)[0]["delay"] == 60
+
+    with open(log_path) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    assert rows[1]["reason"] == "close approaching"
+    assert rows[1]["requests_left"] == "600"
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("dotenv")
+pytest.importorskip("alpha_vantage")
+
+import retrain_worker
+from retrain_worker import RetrainWorker
+
+
+def test_failed_fetch_is_retried_until_daily_cap(monkeypatch, tmp_path):
+    calls = []
+
+    def flaky_fetch(file_name, symbol):
+        calls.append(symbol)
+        if len(calls) < 2:
+            raise ValueError("rate limited")
+
+    monkeypatch.setattr(retrain_worker, "get_hist_data", flaky_fetch)
+    worker = RetrainWorker(max_fetches_per_day=3, data_path=str(tmp_path / "bars.csv"),
+                           model_dir=str(tmp_path / "models"))
+
+    worker._fetch_daily_bars()
+    assert worker.last_fetch_date is None
+    worker._fetch_daily_bars()
+    assert worker.last_fetch_date is not None
+    # Once a fetch succeeded no further calls are made that day
+    worker._fetch_daily_bars()
+    assert len(calls) == 2
+
+
+def test_fetch_gives_up_after_daily_cap(monkeypatch, tmp_path):
+    calls = []
+
+    def failing_fetch(file_name, symbol):
+        calls.append(symbol)
+        raise ValueError("down")
+
+    monkeypatch.setattr(retrain_worker, "get_hist_data", failing_fetch)
+    worker = RetrainWorker(max_fetches_per_day=2, data_path=str(tmp_path / "bars.csv"),
+                           model_dir=str(tmp_path / "models"))
+    for _ in range(5):
+        worker._fetch_daily_bars()
+    assert len(calls) == 2
+    assert worker.last_fetch_date is None
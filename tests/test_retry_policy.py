@@ -0,0 +1,110 @@
+import pytest
+
+from retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.now += secs
+
+
+def test_breaker_opens_probes_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60, clock=clock)
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 60
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only a single probe goes through while half-open
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_unexpected_error_frees_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=clock)
+    policy = RetryPolicy(breaker=breaker, clock=clock, sleep=clock.sleep)
+    breaker.record_failure()
+    clock.now += 60
+
+    def broken(timeout):
+        raise KeyError("not an upstream failure")
+
+    with pytest.raises(KeyError):
+        policy.call(broken, retry_on=(OSError,))
+    assert breaker.allow()
+
+
+def test_call_never_runs_past_deadline():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=100, clock=clock)
+    policy = RetryPolicy(deadline=20, attempt_timeout=10, retry_budget=100,
+                         breaker=breaker, clock=clock, sleep=clock.sleep)
+
+    def hang(timeout):
+        # Every attempt uses its full timeout and then fails
+        clock.now += timeout
+        raise OSError("timed out")
+
+    with pytest.raises(OSError):
+        policy.call(hang)
+    assert clock.now <= 20 + 0.1
+    assert policy.last_attempts >= 2
+
+
+def test_open_breaker_refuses_without_attempting():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, clock=clock)
+    policy = RetryPolicy(breaker=breaker, clock=clock, sleep=clock.sleep)
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        policy.call(lambda timeout: "ok")
+    assert policy.last_attempts == 0
+
+
+def test_retries_stop_when_budget_is_spent():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=100, clock=clock)
+    policy = RetryPolicy(deadline=1000, retry_budget=2, breaker=breaker, clock=clock, sleep=clock.sleep)
+
+    def fail(timeout):
+        raise OSError("down")
+
+    with pytest.raises(OSError):
+        policy.call(fail)
+    assert policy.last_attempts == 3
+    with pytest.raises(OSError):
+        policy.call(fail)
+    assert policy.last_attempts == 1
+